@@ -1,20 +1,55 @@
+from __future__ import annotations
 
-from strands import Agent
 from pydantic import BaseModel, Field
-from typing import List, Optional, Any
-from strands.models import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
-from mcp.client.streamable_http import streamablehttp_client
+from typing import TYPE_CHECKING, List, Optional, Any
 from bedrock_agentcore import BedrockAgentCoreApp
-from bedrock_agentcore_starter_toolkit.operations.gateway.client import GatewayClient
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError
+import boto3
+import urllib3
 import os
+import re
+import math
 import json
+import httpx
+import atexit
+import asyncio
+import base64
+import random
+import hashlib
+import queue
 import logging
+import threading
+import time
+from functools import lru_cache
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# strands, mcp and the starter toolkit are imported where they are first used,
+# so the server starts listening while the warm-up thread pays for them
+if TYPE_CHECKING:
+    from strands import Agent
+    from strands.models import BedrockModel
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=4)
+def _read_configuration(config_path, mtime_ns):
+    """Read and parse a configuration file once per path and modification time; errors are not cached"""
+    with open(config_path, "rb") as f:
+        return _json_loads(f.read())
 
 def load_configuration(config_path):
     """
@@ -26,16 +61,313 @@ def load_configuration(config_path):
     Returns:
         dict: Configuration dictionary with default values if loading fails
     """
-    logging.info(f"Loading configuration from {config_path}")
+    logger.info("Loading configuration from %s", config_path)
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
-        logging.info("Configuration loaded successfully")
+        config = _read_configuration(config_path, os.stat(config_path).st_mtime_ns)
+        logger.info("Configuration loaded successfully")
         return config
     except Exception as e:
-        logging.error(f"Error loading configuration: {str(e)}")
+        logger.error("Error loading configuration: %s", e)
         return {"gateway_url": "", "cognito_info": {"client_info": {}}}
 
+# Cognito issues access tokens with a one hour lifetime by default
+DEFAULT_TOKEN_LIFETIME = 3600
+# Refresh this many seconds before expiry so a token never lapses mid-request
+TOKEN_EARLY_EXPIRY = 45
+# Refresh once this fraction of the token's lifetime has elapsed
+TOKEN_REFRESH_FRACTION = 0.75
+# Seconds to wait before retrying a failed background refresh
+TOKEN_REFRESH_RETRY = 30
+
+def _token_lifetime(token, default=DEFAULT_TOKEN_LIFETIME):
+    """
+    Return the seconds remaining before a JWT access token expires
+    
+    Args:
+        token (str): Encoded JWT
+        default (float): Lifetime to assume when the exp claim cannot be read
+        
+    Returns:
+        float: Seconds until the token's exp claim
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"]) - time.time()
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return default
+
+def _token_deadlines(lifetime, now, early_expiry=TOKEN_EARLY_EXPIRY,
+                     refresh_fraction=TOKEN_REFRESH_FRACTION, min_refresh=TOKEN_REFRESH_RETRY):
+    """
+    Compute when a freshly fetched token should be refreshed and when it stops being usable
+    
+    Args:
+        lifetime (float): Seconds until the token's exp claim
+        now (float): Current monotonic time
+        early_expiry (float): Seconds before expiry at which a token stops being used
+        refresh_fraction (float): Fraction of the lifetime after which to refresh
+        min_refresh (float): Shortest delay before a background refresh, so a
+                             short-lived token cannot make the refresher spin
+        
+    Returns:
+        tuple: (refresh_at, usable_until) as monotonic times
+    """
+    lifetime = max(lifetime, 0.0)
+    # For short lifetimes the fixed early expiry would exceed the lifetime
+    # itself; keep the skew proportional so the token stays usable for a while
+    skew = min(early_expiry, lifetime * (1 - refresh_fraction))
+    usable_in = lifetime - skew
+    refresh_in = max(min(lifetime * refresh_fraction, usable_in), min_refresh)
+    return now + refresh_in, now + usable_in
+
+class _TokenCache:
+    """
+    In-process cache of Cognito access tokens keyed by (client_id, scope)
+    
+    Each entry stores two monotonic deadlines computed from the token's exp
+    claim when it is written: when to refresh it and when it stops being
+    usable. A daemon thread refreshes tokens once their refresh deadline
+    passes, so request threads keep using the current token and only fetch
+    synchronously when nothing valid is cached.
+    """
+
+    def __init__(self, early_expiry=TOKEN_EARLY_EXPIRY, refresh_fraction=TOKEN_REFRESH_FRACTION,
+                 retry_interval=TOKEN_REFRESH_RETRY):
+        self._early_expiry = early_expiry
+        self._refresh_fraction = refresh_fraction
+        self._retry_interval = retry_interval
+        self._tokens = {}
+        self._fetchers = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stopped = False
+        self._refresher = None
+
+    def _store(self, key, token):
+        """Store a token and its deadlines; must be called with the lock held"""
+        refresh_at, usable_until = _token_deadlines(
+            _token_lifetime(token),
+            time.monotonic(),
+            early_expiry=self._early_expiry,
+            refresh_fraction=self._refresh_fraction,
+            min_refresh=self._retry_interval
+        )
+        self._tokens[key] = (token, refresh_at, usable_until)
+        self._changed.notify()
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Return the cached token for key, calling fetch() only when no usable token is cached
+        
+        Args:
+            key (tuple): Cache key identifying the client credentials
+            fetch (callable): Zero-argument callable returning a fresh access token
+            
+        Returns:
+            str: A valid access token
+        """
+        # Holding the lock across fetch() keeps concurrent callers from
+        # stampeding Cognito when no token is cached yet.
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is not None and time.monotonic() < entry[2]:
+                return entry[0]
+            token = fetch()
+            self._fetchers[key] = fetch
+            self._store(key, token)
+            if self._refresher is None and not self._stopped:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+                self._refresher.start()
+            return token
+
+    def peek(self, key):
+        """
+        Return the cached token for key if it is still usable, without blocking or fetching
+        
+        Args:
+            key (tuple): Cache key identifying the client credentials
+            
+        Returns:
+            str: The cached access token, or None if a fetch is needed
+        """
+        # Entries are replaced whole, so reading one does not need the lock
+        # that get_or_fetch() holds across a fetch
+        entry = self._tokens.get(key)
+        if entry is not None and time.monotonic() < entry[2]:
+            return entry[0]
+        return None
+
+    def _refresh_loop(self):
+        """Refresh tokens in the background as their refresh deadlines pass"""
+        while True:
+            with self._lock:
+                while not self._stopped:
+                    due = [key for key, entry in self._tokens.items() if time.monotonic() >= entry[1]]
+                    if due:
+                        break
+                    next_refresh = min((entry[1] for entry in self._tokens.values()), default=None)
+                    self._changed.wait(None if next_refresh is None else next_refresh - time.monotonic())
+                if self._stopped:
+                    return
+                fetchers = [(key, self._fetchers[key]) for key in due]
+
+            # Fetch outside the lock so request threads keep reading the current token
+            for key, fetch in fetchers:
+                try:
+                    token = fetch()
+                except Exception as e:
+                    logger.warning("Background access token refresh failed, retrying in %.0fs: %s",
+                                   self._retry_interval, e)
+                    with self._lock:
+                        entry = self._tokens.get(key)
+                        if entry is not None:
+                            self._tokens[key] = (entry[0], time.monotonic() + self._retry_interval, entry[2])
+                    continue
+                with self._lock:
+                    self._store(key, token)
+
+    def stop(self):
+        """Stop the background refresher"""
+        with self._lock:
+            self._stopped = True
+            self._changed.notify_all()
+
+_token_cache = _TokenCache()
+atexit.register(_token_cache.stop)
+
+# Attempts made for startup calls (Cognito token, MCP session) before giving up
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+_THROTTLING_ERROR_CODES = frozenset({
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "Throttling",
+    "RequestLimitExceeded",
+})
+_RATE_LIMIT_RE = re.compile(r"\b(429|Too Many Requests|Throttl\w*|Rate ?Exceeded)\b", re.IGNORECASE)
+
+# Network failures worth retrying, including the urllib3 errors GatewayClient's
+# Cognito token request raises with its own retries disabled
+_TRANSIENT_NETWORK_ERRORS = (
+    OSError,
+    httpx.TransportError,
+    urllib3.exceptions.TimeoutError,
+    urllib3.exceptions.ProtocolError,
+)
+
+def _exception_chain(exc):
+    """
+    Yield an exception followed by the exceptions it was raised from or while handling
+    
+    MCPClient.start() and GatewayClient wrap the underlying failure in their own
+    exception types, so the cause is only found further down the chain.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+def _is_rate_limited(exc):
+    """Return True if the exception, or any exception it wraps, reports throttling by the remote service"""
+    for error in _exception_chain(exc):
+        if isinstance(error, ClientError):
+            if error.response.get("Error", {}).get("Code") in _THROTTLING_ERROR_CODES:
+                return True
+        elif _RATE_LIMIT_RE.search(str(error)) is not None:
+            return True
+    return False
+
+def _is_retryable(exc):
+    """Return True for throttling and transient network errors, even when wrapped; anything else fails fast"""
+    return (any(isinstance(error, _TRANSIENT_NETWORK_ERRORS) for error in _exception_chain(exc))
+            or _is_rate_limited(exc))
+
+def _retry_after(exc):
+    """Return the Retry-After delay in seconds carried by an exception or any exception it wraps, if any"""
+    for error in _exception_chain(exc):
+        value = getattr(error, "retry_after", None)
+        if value is None:
+            headers = getattr(getattr(error, "response", None), "headers", None)
+            if headers:
+                value = headers.get("Retry-After")
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+def _sleep_backoff(attempt, retry_after=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """
+    Sleep before the next retry using full-jitter exponential backoff
+    
+    Args:
+        attempt (int): Zero-based number of the attempt that just failed
+        retry_after (float, optional): Server-requested delay, honoured when present
+        base (float): Backoff base in seconds
+        cap (float): Maximum delay in seconds
+    """
+    if retry_after is not None:
+        delay = min(cap, retry_after)
+    else:
+        delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    time.sleep(delay)
+
+def _call_with_retries(fn, description, max_attempts=MAX_ATTEMPTS):
+    """
+    Call fn(), retrying throttling and transient network failures with full-jitter backoff
+    
+    Other errors, such as invalid client credentials, are raised immediately.
+    
+    Args:
+        fn (callable): Zero-argument callable to invoke
+        description (str): What is being attempted, for log messages
+        max_attempts (int): Total number of attempts before the last error is raised
+        
+    Returns:
+        The value returned by fn()
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_attempts - 1 or not _is_retryable(e):
+                raise
+            logger.warning("%s failed (attempt %d/%d): %s", description, attempt + 1, max_attempts, e)
+            _sleep_backoff(attempt, retry_after=_retry_after(e))
+
+def _mask_secret(secret):
+    """Return a log-safe form of a secret that keeps only its first and last five characters"""
+    return f"{secret[:5]}...{secret[-5:]}" if len(secret) > 10 else "***masked***"
+
+def _token_cache_key(client_info):
+    """Return the token cache key for a set of Cognito client credentials"""
+    return (client_info.get("client_id"), client_info.get("scope"))
+
+def _cached_access_token(gateway_client, client_info):
+    """
+    Return a valid Cognito access token, fetching one only when no usable token is cached
+    
+    Args:
+        gateway_client: Initialized GatewayClient instance
+        client_info (dict): Cognito client information
+        
+    Returns:
+        str: Access token
+    """
+    def fetch():
+        logger.info("Getting access token from Cognito")
+        return _call_with_retries(
+            lambda: gateway_client.get_access_token_for_cognito(client_info),
+            "Cognito access token request"
+        )
+
+    return _token_cache.get_or_fetch(_token_cache_key(client_info), fetch)
+
 def get_access_token(gateway_client, client_info):
     """
     Get access token from Cognito using the provided client info
@@ -46,42 +378,371 @@ def get_access_token(gateway_client, client_info):
         
     Returns:
         tuple: (access_token, None) if successful, (None, error_message) if failed
+        
+    Raises:
+        Exception: The throttling error if Cognito is still rate limiting after retries,
+                   so callers can back off rather than treat it as a configuration failure
     """
     try:
         # Log client info (with sensitive data masked)
-        safe_client_info = client_info.copy()
-        if "client_secret" in safe_client_info:
-            secret = safe_client_info["client_secret"]
-            safe_client_info["client_secret"] = f"{secret[:5]}...{secret[-5:]}" if len(secret) > 10 else "***masked***"
-        logging.info(f"Client info parameters: {json.dumps(safe_client_info)}")
-        
-        logging.info("Getting access token from Cognito")
-        access_token = gateway_client.get_access_token_for_cognito(client_info)
-        logging.info("Access token obtained successfully")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Client info parameters: client_id=%s client_secret=%s scope=%s "
+                "token_endpoint=%s user_pool_id=%s domain_prefix=%s",
+                client_info.get("client_id"), _mask_secret(client_info.get("client_secret", "")),
+                client_info.get("scope"), client_info.get("token_endpoint"),
+                client_info.get("user_pool_id"), client_info.get("domain_prefix")
+            )
+        
+        access_token = _cached_access_token(gateway_client, client_info)
+        logger.info("Access token obtained successfully")
         return access_token, None
     except Exception as e:
+        if _is_rate_limited(e):
+            raise
         error_msg = f"Error accessing gateway: {str(e)}"
-        logging.error(error_msg, exc_info=True)
+        logger.error(error_msg, exc_info=True)
         return None, error_msg
 
-def create_agent(config_path=None) -> Agent:
+AWS_REGION = "us-east-1"
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "agent_config.json")
+MODEL_ID = "global.anthropic.claude-sonnet-4-20250514-v1:0"
+
+# Seconds a tool list written to disk stays fresh
+TOOLS_CACHE_TTL = 300
+# Cache file last used for each gateway URL, so closing its client can discard it
+_tools_cache_paths = {}
+
+def _tools_cache_path(gateway_url, client_id, scope):
     """
-    Create and initialize an Agent with Bedrock model and MCP client
+    Return the on-disk tool list cache file for a gateway and client identity
+    
+    The gateway can expose different tools to different clients and scopes, so
+    both are part of the key alongside the URL.
+    """
+    cache_root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha256(_json_dumps([gateway_url, client_id, scope])).hexdigest()
+    return os.path.join(cache_root, "ep-agent", f"tools-{key}.json")
+
+def _list_all_tools(client):
+    """
+    Fetch every page of the gateway's tool list
+    
+    MCP pagination is cursor based, so each page request needs the previous
+    page's token and the pages are fetched in order.
+    
+    Args:
+        client (MCPClient): Started MCP client connected to the gateway
+        
+    Returns:
+        list: Agent tools from all pages
+    """
+    tools = []
+    pagination_token = None
+    while True:
+        page = client.list_tools_sync(pagination_token=pagination_token)
+        tools.extend(page)
+        pagination_token = page.pagination_token
+        if not pagination_token:
+            return tools
+
+def _cached_list_tools(client, gateway_url, client_id, scope, ttl=TOOLS_CACHE_TTL):
+    """
+    List the gateway's tools, reusing a recent on-disk copy when available
+    
+    Only the MCP tool descriptors are persisted; they are re-bound to the
+    running client on load, so cached tools still dispatch through it.
+    
+    Args:
+        client (MCPClient): Started MCP client connected to the gateway
+        gateway_url (str): Gateway URL the tools were listed from
+        client_id (str): Cognito client the MCP session is authenticated as
+        scope (str): OAuth scope of the session's access token
+        ttl (int): Maximum age of the cache file in seconds
+        
+    Returns:
+        list: Agent tools backed by the MCP client
+    """
+    from mcp.types import Tool as MCPTool
+    from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+
+    cache_path = _tools_cache_path(gateway_url, client_id, scope)
+    _tools_cache_paths[gateway_url] = cache_path
+    try:
+        if os.path.getmtime(cache_path) + ttl > time.time():
+            with open(cache_path, "rb") as f:
+                descriptors = _json_loads(f.read())
+            tools = [MCPAgentTool(MCPTool.model_validate(d), client) for d in descriptors]
+            logger.info("Loaded %d tools from cache %s", len(tools), cache_path)
+            return tools
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable tools cache %s: %s", cache_path, e)
+
+    tools = _list_all_tools(client)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_json_dumps([tool.mcp_tool.model_dump(mode="json") for tool in tools]))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Could not write tools cache %s: %s", cache_path, e)
+    return tools
+
+# Connection pool settings for the MCP transport so an open session keeps
+# its gateway connections alive between tool calls
+MCP_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=32, keepalive_expiry=30.0)
+# Fail fast on an unreachable gateway instead of waiting out the read timeout
+MCP_HTTP_CONNECT_TIMEOUT = 5.0
+# Connection attempts httpx retries before surfacing a connect error
+MCP_HTTP_CONNECT_RETRIES = 2
+
+def _mcp_http_client(headers=None, *, timeout, auth=None):
+    """Build the pooled httpx client used by the streamable-http MCP transport"""
+    # streamablehttp_client always passes its own timeout, with the SSE read
+    # timeout as the read value; keep those and cap only the connect
+    timeout = httpx.Timeout(
+        connect=MCP_HTTP_CONNECT_TIMEOUT,
+        read=timeout.read,
+        write=timeout.write,
+        pool=timeout.pool
+    )
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout,
+        auth=auth,
+        transport=httpx.AsyncHTTPTransport(limits=MCP_HTTP_LIMITS, retries=MCP_HTTP_CONNECT_RETRIES),
+        follow_redirects=True,
+    )
+
+class _BearerTokenAuth(httpx.Auth):
+    """
+    httpx auth hook that attaches the current access token to every MCP request
+    
+    A long-lived MCP session outlives any single Cognito token, so the token is
+    read from the cache per request rather than captured when the session opens.
+    The MCP transport runs on MCPClient's background event loop, shared by every
+    session's tool calls. The async flow therefore only reads the cached token
+    there and sends any fetch, with its lock and retry backoff, to a worker thread.
+    """
+
+    def __init__(self, token_provider, cached_token):
+        self._token_provider = token_provider
+        self._cached_token = cached_token
+
+    def auth_flow(self, request):
+        token = self._cached_token() or self._token_provider()
+        request.headers["Authorization"] = f"Bearer {token}"
+        yield request
+
+    async def async_auth_flow(self, request):
+        token = self._cached_token()
+        if token is None:
+            token = await asyncio.get_running_loop().run_in_executor(None, self._token_provider)
+        request.headers["Authorization"] = f"Bearer {token}"
+        yield request
+
+# Started MCP clients keyed by gateway URL, shared by every agent in the process
+_mcp_clients = {}
+_mcp_clients_lock = threading.Lock()
+
+# Seconds between liveness checks on the shared MCP sessions
+MCP_HEARTBEAT_INTERVAL = 30
+# Consecutive failed pings before a session is treated as dead
+MCP_HEARTBEAT_MAX_FAILURES = 3
+# Seconds to wait for a ping; list_tools_sync() itself only gives up after the SSE read timeout
+MCP_HEARTBEAT_TIMEOUT = 10
+_mcp_heartbeat = None
+_mcp_heartbeat_stop = threading.Event()
+
+def _ping_mcp_client(client, timeout=MCP_HEARTBEAT_TIMEOUT):
+    """
+    List the session's tools, raising TimeoutError if that takes longer than timeout seconds
+    
+    The call runs on its own daemon thread rather than an executor so that a
+    ping stuck on a half-open socket cannot hold up interpreter exit.
+    """
+    outcome = {}
+
+    def ping():
+        try:
+            client.list_tools_sync()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=ping, name="mcp-heartbeat-ping", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"no response within {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+
+def _mcp_heartbeat_loop(interval=MCP_HEARTBEAT_INTERVAL, max_failures=MCP_HEARTBEAT_MAX_FAILURES,
+                        timeout=MCP_HEARTBEAT_TIMEOUT):
+    """
+    Ping every started MCP session on a fixed interval
+    
+    A half-closed connection would otherwise stall the next request until the
+    read timeout. A session that fails max_failures pings in a row is closed
+    so the next request reconnects, and one that is no longer running is
+    closed straight away; throttled pings say nothing about the connection
+    and are not counted.
+    """
+    failures = {}
+    while not _mcp_heartbeat_stop.wait(interval):
+        with _mcp_clients_lock:
+            clients = list(_mcp_clients.items())
+        # Forget clients that have since been closed or replaced
+        failures = {client: count for client, count in failures.items()
+                    if any(client is started for _, started in clients)}
+        for gateway_url, client in clients:
+            try:
+                _ping_mcp_client(client, timeout)
+            except Exception as e:
+                if _is_rate_limited(e):
+                    logger.debug("MCP heartbeat to %s throttled: %s", gateway_url, e)
+                    continue
+                if _is_mcp_session_lost(e):
+                    logger.warning("MCP session to %s is no longer running, reconnecting on next request: %s",
+                                   gateway_url, e)
+                    failures.pop(client, None)
+                    _reset_mcp_client(gateway_url, client)
+                    continue
+                failures[client] = failures.get(client, 0) + 1
+                if failures[client] < max_failures:
+                    logger.warning("MCP heartbeat to %s failed (%d/%d): %s",
+                                   gateway_url, failures[client], max_failures, e)
+                    continue
+                logger.warning("MCP heartbeat to %s failed %d times in a row, reconnecting on next request: %s",
+                               gateway_url, failures[client], e)
+                del failures[client]
+                _reset_mcp_client(gateway_url, client)
+            else:
+                failures.pop(client, None)
+
+def _mcp_client(gateway_url, token_provider, cached_token):
+    """
+    Return the started MCP client for the gateway, opening the session on first use
+    
+    Args:
+        gateway_url (str): MCP gateway endpoint
+        token_provider (callable): Zero-argument callable returning the current access token,
+                                   fetching one if needed
+        cached_token (callable): Zero-argument callable returning the cached access token
+                                 without blocking, or None if it must be fetched
+        
+    Returns:
+        MCPClient: Running MCP client
+    """
+    from mcp.client.streamable_http import streamablehttp_client
+    from strands.tools.mcp.mcp_client import MCPClient
+
+    global _mcp_heartbeat
+    with _mcp_clients_lock:
+        client = _mcp_clients.get(gateway_url)
+        if client is None:
+            # One auth hook per session; it reads the cached token on each
+            # request, so reconnects and token rotation need no new headers
+            auth = _BearerTokenAuth(token_provider, cached_token)
+
+            def start():
+                started = MCPClient(lambda: streamablehttp_client(
+                        gateway_url,
+                        auth=auth,
+                        httpx_client_factory=_mcp_http_client
+                ))
+                started.start()
+                return started
+
+            client = _call_with_retries(start, "MCP session start")
+            _mcp_clients[gateway_url] = client
+            logger.info("MCP Client created")
+            if _mcp_heartbeat is None:
+                _mcp_heartbeat = threading.Thread(target=_mcp_heartbeat_loop, name="mcp-heartbeat", daemon=True)
+                _mcp_heartbeat.start()
+        return client
+
+def _stop_mcp_client(gateway_url, client):
+    """Stop an MCP client that has already been removed from the registry"""
+    try:
+        client.stop(None, None, None)
+    except Exception as e:
+        logger.warning("Error stopping MCP client for %s: %s", gateway_url, e)
+
+def _close_mcp_clients(invalidate_tools_cache=False):
+    """Stop every started MCP client, optionally discarding their cached tool lists"""
+    with _mcp_clients_lock:
+        while _mcp_clients:
+            gateway_url, client = _mcp_clients.popitem()
+            cache_path = _tools_cache_paths.pop(gateway_url, None)
+            if invalidate_tools_cache and cache_path:
+                try:
+                    os.remove(cache_path)
+                except OSError:
+                    pass
+            _stop_mcp_client(gateway_url, client)
+
+atexit.register(_close_mcp_clients)
+# atexit runs handlers in reverse, so the heartbeat stops before the sessions close
+atexit.register(_mcp_heartbeat_stop.set)
+
+@lru_cache(maxsize=1)
+def _gateway_client():
+    """Return the process-wide GatewayClient, constructing it on first use"""
+    from bedrock_agentcore_starter_toolkit.operations.gateway.client import GatewayClient
+
+    logger.info("Initializing Gateway Client")
+    return GatewayClient(region_name=AWS_REGION)
+
+# Bedrock runtime connection pool, sized for concurrent requests sharing one model
+BEDROCK_CLIENT_CONFIG = BotocoreConfig(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+)
+
+@lru_cache(maxsize=1)
+def _boto_session() -> boto3.Session:
+    """Return the process-wide boto3 Session so credentials are resolved once"""
+    return boto3.Session(region_name=AWS_REGION)
+
+@lru_cache(maxsize=1)
+def _bedrock_model() -> BedrockModel:
+    """Return the process-wide BedrockModel, constructing its boto3 client once"""
+    from strands.models import BedrockModel
+
+    logger.info("Creating BedrockModel %s in %s", MODEL_ID, AWS_REGION)
+    return BedrockModel(
+        model_id=MODEL_ID,
+        boto_session=_boto_session(),
+        boto_client_config=BEDROCK_CLIENT_CONFIG
+    )
+
+# Runs independent pieces of agent startup alongside the Cognito/MCP calls
+_init_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-init")
+
+def load_agent_components(config_path=None):
+    """
+    Authenticate, open the MCP session and gather what every Agent is built from
     
     Args:
         config_path (str, optional): Path to the configuration JSON file. 
                                     If None, uses default path.
     
     Returns:
-        Agent: Initialized Agent instance with model and tools
+        tuple: (BedrockModel, list of MCP tools), or None if initialization failed
     """
-    # Initialize Gateway Client
-    logging.info("Initializing Gateway Client")
-    gateway_client = GatewayClient(region_name="us-east-1")
+    # Build the Bedrock model's boto3 client while the token is fetched and
+    # the MCP session is opened; neither depends on the other
+    model_future = _init_executor.submit(_bedrock_model)
+    gateway_client = _gateway_client()
     
     # Load configuration
     if config_path is None:
-        config_path = os.path.join(os.path.dirname(__file__), "agent_config.json")
+        config_path = DEFAULT_CONFIG_PATH
     
     config = load_configuration(config_path)
     access_token = None
@@ -97,42 +758,211 @@ def create_agent(config_path=None) -> Agent:
         if access_token:
             # Get gateway URL from configuration
             gateway_url = config.get("gateway_url", "https://your-gateway-url.amazonaws.com")
-            logging.info(f"Using gateway URL: {gateway_url}")
+            logger.info("Using gateway URL: %s", gateway_url)
     else:
-        logging.error("Missing required configuration: cognito_info or client_info not found in config")
+        logger.error("Missing required configuration: cognito_info or client_info not found in config")
         return None
     
     if not access_token or not gateway_url:
-        logging.error("Failed to initialize agent: Missing access token or gateway URL")
+        logger.error("Failed to initialize agent: Missing access token or gateway URL")
         return None
- 
-    logging.info("Creating BedrockModel with Claude Sonnet us-east-1")
-    model = BedrockModel(
-        model_id="global.anthropic.claude-sonnet-4-20250514-v1:0",
-        region_name="us-east-1"
+
+    client_info = config["cognito_info"]["client_info"]
+    client = _mcp_client(
+        gateway_url,
+        lambda: _cached_access_token(gateway_client, client_info),
+        lambda: _token_cache.peek(_token_cache_key(client_info))
     )
+    tools = _cached_list_tools(client, gateway_url, client_info.get("client_id"), client_info.get("scope"))
+    logger.info("Retrieved %d tools from MCP gateway", len(tools))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Gateway tools: %s", [tool.tool_name for tool in tools])
+    return model_future.result(), tools
 
-    client = MCPClient(lambda: streamablehttp_client(
-            gateway_url,
-            headers={"Authorization": f"Bearer {access_token}"}
-    ))
+def create_agent(config_path=None, messages=None) -> Agent:
+    """
+    Create and initialize an Agent with Bedrock model and MCP client
+    
+    Args:
+        config_path (str, optional): Path to the configuration JSON file. 
+                                    If None, uses default path.
+        messages (list, optional): Conversation history to start from
+    
+    Returns:
+        Agent: Initialized Agent instance with model and tools
+    """
+    components = load_agent_components(config_path)
+    if components is None:
+        return None
+    model, tools = components
+    return _build_agent(model, tools, messages)
 
-    client.start()    
-    logging.info("MCP Client created")
+def _build_agent(model, tools, messages=None) -> Agent:
+    """Build an Agent over an already initialized model and tool list"""
+    from strands import Agent
+    from strands.hooks import AfterToolCallEvent
+    from strands.tools.executors import ConcurrentToolExecutor
 
-    tools = client.list_tools_sync()
-    logging.info(f"Retrieved {len(tools)} tools from MCP gateway")
-    
-    return Agent(model=model, tools=tools)
+    # Independent tool calls from one model turn run concurrently over the
+    # shared MCP session instead of one after another
+    agent = Agent(
+        model=model,
+        tools=tools,
+        system_prompt=SYSTEM_PROMPT,
+        messages=messages,
+        tool_executor=ConcurrentToolExecutor()
+    )
+    agent.hooks.add_callback(AfterToolCallEvent, _flag_mcp_session_lost)
+    return agent
 
-def get_system_prompt():
-    return """
+SYSTEM_PROMPT = """
 You are an expert estate planning assistant. Your goal is to help users create and manage their estate plans, including wills, trusts, powers of attorney, and healthcare directives. You should provide clear, concise, and accurate information based on the user's needs and preferences.
 
-"""  
+"""
+
+def get_system_prompt():
+    return SYSTEM_PROMPT
+
+_components = None
+_components_generation = 0
+_components_lock = threading.Lock()
+
+def _shared_components():
+    """
+    Return the model and tools shared by every session's Agent, initializing them on first use
+    
+    Deferring creation keeps Cognito auth and MCP tool listing off the import
+    path. Concurrent first requests wait on one initialization instead of each
+    running their own. A failed attempt raises and is not cached, so the next
+    request retries.
+    
+    Returns:
+        tuple: (generation, model, tools); generation changes whenever the
+               components are rebuilt after a reset
+    """
+    global _components
+    components = _components
+    if components is None:
+        with _components_lock:
+            if _components is None:
+                loaded = load_agent_components()
+                if loaded is None:
+                    raise Exception("Failed to initialize agent")
+                _components = (_components_generation, *loaded)
+            components = _components
+    return components
+
+# Conversations kept in memory; the least recently used session is evicted first
+MAX_SESSION_AGENTS = 512
+_session_agents = OrderedDict()
+_session_agents_lock = threading.Lock()
+
+def _agent(session_id):
+    """
+    Return the Agent holding the conversation for a session, creating it on the session's first request
+    
+    Agents are cheap to build once the shared model and tools exist, so each
+    session gets its own conversation history. An Agent left over from before
+    a reconnect is rebuilt over the new tools with its history carried across.
+    
+    Returns:
+        tuple: (generation, Agent); pass the generation to _reset_agent() if the
+               agent's MCP session turns out to be gone
+    """
+    generation, model, tools = _shared_components()
+    with _session_agents_lock:
+        entry = _session_agents.get(session_id)
+        if entry is not None and entry[0] == generation:
+            _session_agents.move_to_end(session_id)
+            return entry
+    # Copy the history so a call still running on the stale agent cannot
+    # append to the rebuilt agent's conversation
+    messages = list(entry[1].messages) if entry is not None else None
+    agent = _build_agent(model, tools, messages)
+    with _session_agents_lock:
+        # Another request for this session may have built its agent meanwhile;
+        # keep that one so neither request's turn is lost
+        current = _session_agents.get(session_id)
+        if current is not None and current[0] == generation:
+            _session_agents.move_to_end(session_id)
+            return current
+        _session_agents[session_id] = (generation, agent)
+        _session_agents.move_to_end(session_id)
+        while len(_session_agents) > MAX_SESSION_AGENTS:
+            _session_agents.popitem(last=False)
+    return generation, agent
+
+def _reset_agent(generation=None):
+    """
+    Drop the shared components and MCP session so the next request reconnects
+    
+    Args:
+        generation (int, optional): Only reset if the components are still at this
+                                    generation, so a request that failed on an old
+                                    session does not close the one another request
+                                    has just rebuilt
+                                    
+    Returns:
+        bool: True if this call performed the reset
+    """
+    global _components, _components_generation
+    # Closing the clients under the components lock keeps a concurrent rebuild
+    # from opening a new session that would then be closed here
+    with _components_lock:
+        if generation is not None and generation != _components_generation:
+            return False
+        _components = None
+        _components_generation += 1
+        _close_mcp_clients(invalidate_tools_cache=True)
+    return True
+
+def _reset_mcp_client(gateway_url, client):
+    """
+    Close one dead MCP client and drop the shared components built on it
+    
+    Unlike _reset_agent(), other sessions and the on-disk tool list are left
+    alone, since a dropped connection says nothing about the gateway's tools.
+    Session agents keep their history and are rebuilt on their next request.
+    
+    Args:
+        gateway_url (str): Gateway the client is registered under
+        client (MCPClient): The client that failed
+        
+    Returns:
+        bool: False if the client had already been closed or replaced
+    """
+    global _components, _components_generation
+    with _components_lock:
+        with _mcp_clients_lock:
+            if _mcp_clients.get(gateway_url) is not client:
+                return False
+            del _mcp_clients[gateway_url]
+        _components = None
+        _components_generation += 1
+    _stop_mcp_client(gateway_url, client)
+    return True
+
+def _is_mcp_session_lost(exc):
+    """Return True if an error was caused by an MCP session that is no longer running"""
+    from strands.types.exceptions import MCPClientInitializationError
+
+    return any(isinstance(error, MCPClientInitializationError) for error in _exception_chain(exc))
+
+# invocation_state key set when a tool call in the turn found its MCP session stopped
+MCP_SESSION_LOST = "mcp_session_lost"
+
+def _flag_mcp_session_lost(event):
+    """
+    Record in the invocation state that a tool call failed on a stopped MCP session
+    
+    strands turns tool exceptions into error tool results for the model, so
+    nothing is raised out of the agent call; the exception is only visible to
+    hooks on the after-tool-call event.
+    """
+    if event.exception is not None and _is_mcp_session_lost(event.exception):
+        event.invocation_state[MCP_SESSION_LOST] = True
 
 app = BedrockAgentCoreApp()
-agent = create_agent()
 
 class ToolResult(BaseModel):
     tool_name: str
@@ -147,28 +977,139 @@ class AgentResponse(BaseModel):
     action_required: bool = Field(default=False, description="Whether user action is needed")
     metadata: dict = Field(default_factory=dict, description="Additional context")
 
-@app.entrypoint
-def invoke(payload, context):
+def _respond(agent, user_message, invocation_state=None):
+    """
+    Run the agent on the user's message and return its structured response
+    
+    The structured output model is passed to the agent invocation itself, so
+    tool use and response formatting happen in one event loop rather than a
+    second Bedrock round trip that re-reads the whole conversation.
+    """
+    result = agent(user_message, invocation_state=invocation_state, structured_output_model=AgentResponse)
+    return result.structured_output
 
-    user_message = payload["prompt"]
-    session_id = context.session_id
+@dataclass(slots=True, frozen=True)
+class InvocationRequest:
+    prompt: str
+    session_id: str
 
-    if not session_id:
-        raise Exception("Session ID is required in the context")
+def parse_request(payload, context) -> InvocationRequest:
+    """
+    Validate an invocation once and return its prompt and session ID
     
-    logging.info(f"Received request with session ID: {session_id}")
+    Args:
+        payload (dict): Request body sent to the entrypoint
+        context: AgentCore request context carrying the session ID
+        
+    Returns:
+        InvocationRequest: Validated request fields
+        
+    Raises:
+        ValueError: If the prompt or the session ID is missing
+    """
+    prompt = payload.get("prompt")
+    session_id = getattr(context, "session_id", None)
+    if not prompt or not session_id:
+        raise ValueError("A 'prompt' in the payload and a session ID in the context are required")
+    return InvocationRequest(prompt=prompt, session_id=session_id)
+
+# Agent invocations allowed to run at once; each can drive several MCP tool
+# calls, so this keeps bursts from draining the MCP connection pool
+MCP_MAX_INFLIGHT = int(os.environ.get("MCP_MAX_INFLIGHT", "20"))
+_inflight = threading.BoundedSemaphore(MCP_MAX_INFLIGHT)
+
+# Monotonic time before which invoke() answers with a rate-limit response
+# instead of retrying agent initialization
+_cooldown_until = 0.0
 
-    response = agent(user_message)
-    structured_result = agent.structured_output(
-        AgentResponse,
-        "Format the response as JSON"
+def _rate_limited_response(retry_after):
+    """Build the response returned while agent initialization is being throttled"""
+    retry_after = max(1, math.ceil(retry_after))
+    return AgentResponse(
+        status="error",
+        message=f"The estate planning agent is temporarily rate limited. Please retry in {retry_after} seconds.",
+        metadata={"code": "agent.rate_limited", "retry_after": retry_after}
     )
 
-    structured_result.message = str(response.message["content"][0]["text"])
+def _start_cooldown(exc):
+    """Pause agent initialization after a throttling error and build the response returned meanwhile"""
+    global _cooldown_until
+    retry_after = _retry_after(exc) or BACKOFF_CAP
+    _cooldown_until = time.monotonic() + retry_after
+    logger.warning("Agent initialization rate limited, cooling down for %.0fs: %s", retry_after, exc)
+    return _rate_limited_response(retry_after)
+
+@app.entrypoint
+def invoke(payload, context):
+    request = parse_request(payload, context)
+    logger.info("Received request with session ID: %s", request.session_id)
 
-    return structured_result
+    remaining = _cooldown_until - time.monotonic()
+    if remaining > 0:
+        return _rate_limited_response(remaining)
+
+    try:
+        generation, agent = _agent(request.session_id)
+    except Exception as e:
+        if not _is_rate_limited(e):
+            raise
+        return _start_cooldown(e)
+
+    with _inflight:
+        history_length = len(agent.messages)
+        invocation_state = {}
+        response = _respond(agent, request.prompt, invocation_state)
+        if not invocation_state.get(MCP_SESSION_LOST):
+            return response
+
+        # The turn ran against a stopped MCP session, so its tool calls all failed;
+        # reconnect once and replay the prompt
+        logger.warning("MCP session unavailable for session %s, reconnecting", request.session_id)
+        # Drop the failed turn so the replay does not repeat the prompt
+        del agent.messages[history_length:]
+        # Concurrent requests that failed on the same session reset it only once
+        _reset_agent(generation)
+
+        # Rebuilding reconnects to Cognito and the gateway, which can be throttled too
+        try:
+            _, agent = _agent(request.session_id)
+        except Exception as e:
+            if not _is_rate_limited(e):
+                raise
+            return _start_cooldown(e)
+        return _respond(agent, request.prompt)
+
+def _configure_logging():
+    """
+    Route log records through a queue so request threads never block on stream I/O
+    
+    Returns:
+        QueueListener: Started listener; stop it at shutdown to flush pending records
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+def _warm_agent():
+    """Build the shared model and tools ahead of the first request; failures are left for invoke() to retry"""
+    try:
+        _shared_components()
+        logger.info("Agent warmed up")
+    except Exception as e:
+        logger.warning("Agent warm-up failed, will retry on first request: %s", e)
 
 if __name__ == "__main__":
-    logging.info("Starting Estate Planning Agent Gateway")
+    log_listener = _configure_logging()
+    logger.info("Starting Estate Planning Agent Gateway")
+    # Fetch the token, open the MCP session and list tools while the server
+    # starts; the first invoke() waits on the same lock if this is still running
+    threading.Thread(target=_warm_agent, name="agent-warmup", daemon=True).start()
     app.run()
-    logging.info("Agent Gateway shutdown")
+    logger.info("Agent Gateway shutdown")
+    log_listener.stop()
@@ -10,11 +10,18 @@ import requests
 import urllib.parse
 import logging
 import uuid
+import traceback
 from typing import Any, Optional
 
 agent_name = "ep_agent"
 prompt = "Hello!"
 
+# Reuse one session so every prompt in the chat loop shares pooled connections
+http_session = requests.Session()
+
+logger = logging.getLogger("bedrock_agentcore.stream")
+logger.setLevel(logging.INFO)
+
 def get_aws_region() -> str:
     return os.environ.get("AWS_REGION", "us-east-1")
 
@@ -40,7 +47,7 @@ def invoke_endpoint(
         body = {"payload": payload}
 
     try:
-        response = requests.post(
+        response = http_session.post(
             url,
             params={"qualifier": endpoint_name},
             headers=headers,
@@ -48,9 +55,6 @@ def invoke_endpoint(
             timeout=100,
             stream=True,
         )
-        logger = logging.getLogger("bedrock_agentcore.stream")
-        logger.setLevel(logging.INFO)
-
         last_data = False
         content = []  # Initialize content list
 
@@ -151,7 +155,6 @@ try:
         except Exception as e:
             print(f"\n❌ Error: {e}")
             # Print more detailed error information
-            import traceback
             error_details = traceback.format_exc()
             print(f"Error details:\n{error_details}")
             print("Please try again or type 'exit' to quit.\n")
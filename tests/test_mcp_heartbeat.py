@@ -0,0 +1,69 @@
+import threading
+import unittest
+from unittest import mock
+
+from strands.tools.mcp.mcp_client import MCPClient
+
+import ep_agent
+
+
+class McpHeartbeatTest(unittest.TestCase):
+
+    def tearDown(self):
+        ep_agent._mcp_heartbeat_stop.clear()
+
+    def run_heartbeat(self, client, pings, max_failures=3):
+        """Run the heartbeat over a single client until it has pinged pings times, returning the reset mock"""
+        rounds = []
+        ep_agent._mcp_heartbeat_stop.clear()
+
+        def ping(pinged, timeout):
+            rounds.append(pinged)
+            if len(rounds) >= pings:
+                ep_agent._mcp_heartbeat_stop.set()
+            return ping_mcp_client(pinged, timeout)
+
+        ping_mcp_client = ep_agent._ping_mcp_client
+        with mock.patch.dict(ep_agent._mcp_clients, {"https://gateway.example/mcp": client}, clear=True), \
+                mock.patch.object(ep_agent, "_ping_mcp_client", ping), \
+                mock.patch.object(ep_agent, "_reset_mcp_client") as reset:
+            ep_agent._mcp_heartbeat_loop(interval=0, max_failures=max_failures, timeout=0.05)
+        return reset
+
+    def test_ping_that_hangs_times_out(self):
+        release = threading.Event()
+        client = mock.Mock(list_tools_sync=release.wait)
+
+        with self.assertRaises(TimeoutError):
+            ep_agent._ping_mcp_client(client, timeout=0.05)
+        release.set()
+
+    def test_stopped_session_is_reset_on_first_ping(self):
+        client = MCPClient(lambda: None)
+
+        reset = self.run_heartbeat(client, pings=1)
+
+        reset.assert_called_once_with("https://gateway.example/mcp", client)
+
+    def test_hung_session_is_reset_after_max_failures(self):
+        release = threading.Event()
+        client = mock.Mock(list_tools_sync=release.wait)
+
+        reset = self.run_heartbeat(client, pings=2)
+        reset.assert_not_called()
+        reset = self.run_heartbeat(client, pings=3)
+        release.set()
+
+        reset.assert_called_once_with("https://gateway.example/mcp", client)
+
+    def test_healthy_session_is_kept(self):
+        client = mock.Mock()
+
+        reset = self.run_heartbeat(client, pings=3)
+
+        reset.assert_not_called()
+        self.assertEqual(client.list_tools_sync.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from mcp.types import Tool as MCPTool
+from strands import tool
+from strands.models import Model
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+from strands.tools.mcp.mcp_client import MCPClient
+
+import ep_agent
+
+
+class ScriptedModel(Model):
+    """
+    Model that calls the lookup tool, then reports that tool's result through
+    the AgentResponse structured output tool
+    """
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        tool_result = next(
+            (block["toolResult"] for block in messages[-1]["content"] if "toolResult" in block),
+            None
+        )
+        if tool_result is None:
+            name, tool_input = "lookup", "{}"
+        else:
+            name = "AgentResponse"
+            tool_input = ep_agent.json.dumps({
+                "status": tool_result["status"],
+                "message": tool_result["content"][0]["text"],
+            })
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"{name}-1", "name": name}}}}
+        yield {"contentBlockDelta": {"delta": {"toolUse": {"input": tool_input}}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use"}}
+
+
+@tool
+def lookup() -> str:
+    """Look up the client's estate plan"""
+    return "found"
+
+
+def stopped_session_tools():
+    """Return a lookup tool bound to an MCP client whose session is not running"""
+    mcp_tool = MCPTool(name="lookup", description="Look up the client's estate plan",
+                       inputSchema={"type": "object", "properties": {}})
+    return [MCPAgentTool(mcp_tool, MCPClient(lambda: None))]
+
+
+class McpSessionLostTest(unittest.TestCase):
+
+    def test_tool_call_on_stopped_session_is_flagged(self):
+        agent = ep_agent._build_agent(ScriptedModel(), stopped_session_tools())
+        invocation_state = {}
+
+        response = ep_agent._respond(agent, "hi", invocation_state)
+
+        self.assertEqual(response.status, "error")
+        self.assertTrue(invocation_state.get(ep_agent.MCP_SESSION_LOST))
+
+    def test_working_tool_call_is_not_flagged(self):
+        agent = ep_agent._build_agent(ScriptedModel(), [lookup])
+        invocation_state = {}
+
+        response = ep_agent._respond(agent, "hi", invocation_state)
+
+        self.assertEqual(response.message, "found")
+        self.assertNotIn(ep_agent.MCP_SESSION_LOST, invocation_state)
+
+    def test_invoke_reconnects_and_replays_the_turn(self):
+        model = ScriptedModel()
+        first_generation = ep_agent._components_generation
+        tools_by_generation = {first_generation: stopped_session_tools(), first_generation + 1: [lookup]}
+
+        def shared_components():
+            generation = ep_agent._components_generation
+            return generation, model, tools_by_generation[generation]
+
+        with mock.patch.object(ep_agent, "_shared_components", shared_components), \
+                mock.patch.object(ep_agent, "_close_mcp_clients"):
+            response = ep_agent.invoke({"prompt": "hi"}, SimpleNamespace(session_id="session-1"))
+            _, agent = ep_agent._agent("session-1")
+
+        self.assertEqual(response.status, "success")
+        self.assertEqual(response.message, "found")
+        self.assertEqual(ep_agent._components_generation, first_generation + 1)
+        # Only the replayed turn is kept: prompt, tool use, tool result, structured output
+        self.assertEqual(agent.messages[0]["content"], [{"text": "hi"}])
+        self.assertEqual(sum(1 for message in agent.messages if message["content"] == [{"text": "hi"}]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+
+import httpx
+import urllib3
+from botocore.exceptions import ClientError
+from bedrock_agentcore_starter_toolkit.operations.gateway.exceptions import GatewaySetupException
+from strands.types.exceptions import MCPClientInitializationError
+
+import ep_agent
+
+
+def wrapped(outer, inner):
+    """Return outer raised from inner, the way MCPClient and GatewayClient wrap errors"""
+    try:
+        try:
+            raise inner
+        except Exception as e:
+            raise outer from e
+    except Exception as e:
+        return e
+
+
+def throttling_error(code="ThrottlingException"):
+    return ClientError({"Error": {"Code": code, "Message": "slow down"}}, "Converse")
+
+
+class RetryClassificationTest(unittest.TestCase):
+
+    def test_wrapped_connect_error_is_retryable(self):
+        exc = wrapped(MCPClientInitializationError("the client initialization failed"),
+                      httpx.ConnectError("connection refused"))
+        self.assertTrue(ep_agent._is_retryable(exc))
+
+    def test_wrapped_urllib3_read_timeout_is_retryable(self):
+        exc = wrapped(GatewaySetupException("Failed to get token: read timed out"),
+                      urllib3.exceptions.ReadTimeoutError(None, "/oauth2/token", "read timed out"))
+        self.assertTrue(ep_agent._is_retryable(exc))
+
+    def test_throttling_is_retryable_plain_or_wrapped(self):
+        self.assertTrue(ep_agent._is_retryable(throttling_error()))
+        self.assertTrue(ep_agent._is_retryable(
+            wrapped(MCPClientInitializationError("the client initialization failed"), throttling_error())
+        ))
+
+    def test_rate_limited_message_is_retryable(self):
+        self.assertTrue(ep_agent._is_retryable(GatewaySetupException("Token request failed: Too Many Requests")))
+
+    def test_other_errors_fail_fast(self):
+        self.assertFalse(ep_agent._is_retryable(ValueError("bad config")))
+        self.assertFalse(ep_agent._is_retryable(throttling_error("AccessDeniedException")))
+        self.assertFalse(ep_agent._is_retryable(
+            wrapped(GatewaySetupException("Token request failed: invalid_client"), ValueError("invalid_client"))
+        ))
+
+    def test_retry_after_is_read_from_a_wrapped_error(self):
+        response = httpx.Response(429, headers={"Retry-After": "7"},
+                                  request=httpx.Request("POST", "https://gateway.example"))
+        inner = httpx.HTTPStatusError("Too Many Requests", request=response.request, response=response)
+        exc = wrapped(MCPClientInitializationError("the client initialization failed"), inner)
+        self.assertEqual(ep_agent._retry_after(exc), 7.0)
+
+    def test_call_with_retries_retries_a_wrapped_transient_error(self):
+        calls = []
+
+        def start():
+            calls.append(None)
+            if len(calls) == 1:
+                raise wrapped(MCPClientInitializationError("the client initialization failed"),
+                              httpx.ConnectError("connection refused"))
+            return "started"
+
+        with mock.patch.object(ep_agent, "_sleep_backoff") as sleep_backoff:
+            self.assertEqual(ep_agent._call_with_retries(start, "MCP session start"), "started")
+        self.assertEqual(len(calls), 2)
+        sleep_backoff.assert_called_once()
+
+    def test_call_with_retries_raises_other_errors_immediately(self):
+        fn = mock.Mock(side_effect=wrapped(GatewaySetupException("Token request failed"), ValueError("invalid_client")))
+
+        with mock.patch.object(ep_agent, "_sleep_backoff") as sleep_backoff:
+            with self.assertRaises(GatewaySetupException):
+                ep_agent._call_with_retries(fn, "Cognito access token request")
+        fn.assert_called_once()
+        sleep_backoff.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
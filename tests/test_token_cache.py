@@ -0,0 +1,122 @@
+import base64
+import json
+import threading
+import time
+import unittest
+
+from ep_agent import _TokenCache, _token_deadlines
+
+
+def jwt(lifetime, name="token"):
+    """Return an unsigned JWT whose exp claim is lifetime seconds from now"""
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": time.time() + lifetime}).encode()).decode().rstrip("=")
+    return f"{name}.{payload}.signature"
+
+
+class TokenDeadlinesTest(unittest.TestCase):
+
+    def test_hour_long_token_uses_fixed_early_expiry(self):
+        refresh_at, usable_until = _token_deadlines(3600, now=100.0)
+        self.assertEqual(usable_until, 100.0 + 3600 - 45)
+        self.assertEqual(refresh_at, 100.0 + 3600 * 0.75)
+
+    def test_short_token_stays_usable(self):
+        refresh_at, usable_until = _token_deadlines(40, now=100.0)
+        self.assertEqual(usable_until, 100.0 + 30)
+        self.assertGreater(usable_until, 100.0)
+        self.assertEqual(refresh_at, 100.0 + 30)
+
+    def test_very_short_token_refresh_is_not_scheduled_immediately(self):
+        refresh_at, usable_until = _token_deadlines(4, now=100.0)
+        self.assertEqual(usable_until, 103.0)
+        self.assertEqual(refresh_at, 130.0)
+
+    def test_expired_token_is_never_usable(self):
+        refresh_at, usable_until = _token_deadlines(-10, now=100.0)
+        self.assertEqual(usable_until, 100.0)
+        self.assertEqual(refresh_at, 130.0)
+
+
+class TokenCacheTest(unittest.TestCase):
+    KEY = ("client", "scope")
+
+    def token_cache(self, **kwargs):
+        cache = _TokenCache(**kwargs)
+        self.addCleanup(cache.stop)
+        return cache
+
+    def test_get_or_fetch_reuses_a_usable_token(self):
+        cache = self.token_cache(retry_interval=60)
+        calls = []
+
+        def fetch():
+            calls.append(None)
+            return jwt(3600)
+
+        first = cache.get_or_fetch(self.KEY, fetch)
+
+        self.assertEqual(cache.get_or_fetch(self.KEY, fetch), first)
+        self.assertEqual(cache.peek(self.KEY), first)
+        self.assertEqual(len(calls), 1)
+
+    def test_peek_does_not_return_a_missing_or_expired_token(self):
+        cache = self.token_cache(early_expiry=0.01, retry_interval=60)
+        self.assertIsNone(cache.peek(self.KEY))
+
+        cache.get_or_fetch(self.KEY, lambda: jwt(0.05, "short"))
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.peek(self.KEY))
+        self.assertTrue(cache.get_or_fetch(self.KEY, lambda: jwt(3600, "fresh")).startswith("fresh."))
+
+    def test_refresher_swaps_in_a_new_token_before_expiry(self):
+        cache = self.token_cache(early_expiry=0.1, refresh_fraction=0.5, retry_interval=0.1)
+        tokens = iter([jwt(1.0, "first"), jwt(3600, "second")])
+        refreshed = threading.Event()
+
+        def fetch():
+            token = next(tokens)
+            if token.startswith("second."):
+                refreshed.set()
+            return token
+
+        self.assertTrue(cache.get_or_fetch(self.KEY, fetch).startswith("first."))
+        # The first token is still usable while the refresh has not run yet
+        self.assertTrue(cache.peek(self.KEY).startswith("first."))
+
+        self.assertTrue(refreshed.wait(2))
+        deadline = time.monotonic() + 1
+        while not cache.peek(self.KEY).startswith("second.") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(cache.peek(self.KEY).startswith("second."))
+
+    def test_failed_refresh_is_retried_after_the_retry_interval(self):
+        cache = self.token_cache(early_expiry=0.1, refresh_fraction=0.1, retry_interval=0.2)
+        calls = []
+        recovered = threading.Event()
+
+        def fetch():
+            calls.append(time.monotonic())
+            if len(calls) == 2:
+                raise OSError("connection reset")
+            if len(calls) == 3:
+                recovered.set()
+            return jwt(5, f"token{len(calls)}")
+
+        self.assertTrue(cache.get_or_fetch(self.KEY, fetch).startswith("token1."))
+
+        self.assertTrue(recovered.wait(3))
+        self.assertGreaterEqual(calls[2] - calls[1], 0.2)
+
+    def test_stop_ends_the_refresher(self):
+        cache = _TokenCache(retry_interval=60)
+        cache.get_or_fetch(self.KEY, lambda: jwt(3600))
+
+        cache.stop()
+        cache._refresher.join(1)
+
+        self.assertFalse(cache._refresher.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
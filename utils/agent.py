@@ -9,10 +9,24 @@ import urllib.parse
 import os
 import boto3
 import yaml
+import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional, Union
+from requests.adapters import HTTPAdapter
 from utils.formatting import Colors
 
 
+logger = logging.getLogger(__name__)
+
+
+# Shared HTTP session so consecutive prompts reuse pooled keep-alive
+# connections instead of paying a new TCP/TLS handshake per request.
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50))
+_http_session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=50))
+_http_session.headers["Content-Type"] = "application/json"
+
+
 def invoke_agent(prompt: str, 
                 session_id: Optional[str] = None, 
                 endpoint: str = "http://localhost:8080/invocations",
@@ -26,8 +40,8 @@ def invoke_agent(prompt: str,
             "error": "Missing required parameters for remote agent invocation"
         }
 
+    # Content-Type is a session default; only per-request headers are built here
     headers = {
-        "Content-Type": "application/json",
         "X-Amzn-Bedrock-AgentCore-Runtime-Session-Id": session_id,
     }
     
@@ -68,7 +82,7 @@ def invoke_agent(prompt: str,
             print(f"{Colors.BLUE}Invoking remote agent at: {url}{Colors.END}")
             print(f"{Colors.BLUE}Request payload: {json.dumps(body)}{Colors.END}")
             
-            response = requests.post(
+            response = _http_session.post(
                 url,
                 params={"qualifier": "DEFAULT"},
                 headers=headers,
@@ -83,7 +97,7 @@ def invoke_agent(prompt: str,
             try:
                 # First, try to parse the entire response as a JSON object
                 # (This is the format we're seeing in the debug output)
-                response_text = ""
+                response_lines = []
                 line_count = 0
                 json_response = None
                 
@@ -91,8 +105,11 @@ def invoke_agent(prompt: str,
                     line_count += 1
                     if line:
                         decoded_line = line.decode("utf-8")
-                        print(f"{Colors.YELLOW}DEBUG RAW[{line_count}]: {decoded_line}{Colors.END}")
-                        response_text += decoded_line
+                        logger.debug("RAW[%d]: %s", line_count, decoded_line)
+                        response_lines.append(decoded_line)
+                
+                # Join once rather than growing a string per line
+                response_text = "".join(response_lines)
                 
                 if response_text:
                     try:
@@ -100,8 +117,8 @@ def invoke_agent(prompt: str,
                         print(f"{Colors.GREEN}Successfully parsed JSON response{Colors.END}")
                         
                         # Extract the message from the JSON response
-                        if "message" in json_response:
-                            message = json_response["message"]
+                        message = json_response.get("message")
+                        if message is not None:
                             print(f"{Colors.BLUE}Response received ({len(message)} characters from JSON){Colors.END}")
                             
                             # Return both the extracted message and the full JSON response
@@ -127,7 +144,7 @@ def invoke_agent(prompt: str,
             
         else:
             # Local agent invocation
-            response = requests.post(
+            response = _http_session.post(
                 endpoint,
                 headers=headers,
                 json=body,
@@ -193,6 +210,20 @@ def get_agent_arn(agent_name: str) -> Optional[str]:
         return None
 
 
+@lru_cache(maxsize=1)
+def get_gateway_client():
+    """
+    Get the shared GatewayClient, creating it on first use.
+    
+    Returns:
+        GatewayClient for us-east-1, reused so its boto3 clients and
+        credential resolution are only set up once per process
+    """
+    from bedrock_agentcore_starter_toolkit.operations.gateway.client import GatewayClient
+    
+    return GatewayClient(region_name="us-east-1")
+
+
 def setup_remote_agent(agent_name: str = "ep_agent") -> Dict[str, Any]:
     """
     Set up the remote agent with authentication.
@@ -203,8 +234,6 @@ def setup_remote_agent(agent_name: str = "ep_agent") -> Dict[str, Any]:
     Returns:
         Dictionary containing bearer_token, agent_arn and any error information
     """
-    from bedrock_agentcore_starter_toolkit.operations.gateway.client import GatewayClient
-    
     result = {
         "bearer_token": None,
         "agent_arn": None,
@@ -227,7 +256,7 @@ def setup_remote_agent(agent_name: str = "ep_agent") -> Dict[str, Any]:
         result["agent_arn"] = agent_arn
             
         # Get authentication token
-        client = GatewayClient(region_name="us-east-1")
+        client = get_gateway_client()
         access_token = client.get_access_token_for_cognito(config['cognito_info']['client_info'])
         
         if not access_token:
@@ -157,13 +157,12 @@ def display_response(response: Dict[str, Any]) -> None:
         print(formatted_metadata)
     
     # Special handling for tools_used
-    if "tools_used" in response:
-        tools = response.get("tools_used", [])
-        if tools:
-            print(f"\n{Colors.YELLOW}{Colors.BOLD}🔧 TOOLS USED{Colors.END}")
-            print(f"{Colors.YELLOW}{'=' * 13}{Colors.END}")
-            for i, tool in enumerate(tools, 1):
-                print(f"{Colors.YELLOW}{i}. {tool}{Colors.END}")
+    tools = response.get("tools_used")
+    if tools:
+        print(f"\n{Colors.YELLOW}{Colors.BOLD}🔧 TOOLS USED{Colors.END}")
+        print(f"{Colors.YELLOW}{'=' * 13}{Colors.END}")
+        for i, tool in enumerate(tools, 1):
+            print(f"{Colors.YELLOW}{i}. {tool}{Colors.END}")
     
     # Special handling for action_required
     if "action_required" in response: